@@ -6,13 +6,16 @@ class PyGameComponent(pys.PyGame):
     # Override the script method to define the PyGame code.
     async def script(self):
         import pygame  # type: ignore
-        import asyncio
+        import js  # type: ignore
 
         pygame.init()
 
         screen = pygame.display.set_mode((500, 500))
         fps = 60
+        frame_time = 1000 / fps
+        last_time = js.performance.now()
         counter = 0
+        dirty = True
         running = True
 
         while running:
@@ -20,14 +23,27 @@ class PyGameComponent(pys.PyGame):
                 if event.type == pygame.QUIT:
                     running = False
 
-            screen.fill((0, 0, 0))
-            pygame.draw.circle(screen, (255, 0, 0), (100 + counter, 250), 50)
-            counter += 1
-            counter %= 300
-            pygame.display.flip()
+            # Advance the animation at a fixed rate, independent of the display refresh rate.
+            now = js.performance.now()
+            if now - last_time > 1000:
+                # Don't try to catch up after the tab was in the background.
+                last_time = now - frame_time
+            while now - last_time >= frame_time:
+                counter += 1
+                counter %= 300
+                last_time += frame_time
+                dirty = True
 
-            # PyScript requires async.sleep to return control to the browser
-            await asyncio.sleep(1 / fps)
+            # Skip the redraw when nothing has changed since the last frame.
+            if dirty:
+                screen.fill((0, 0, 0))
+                pygame.draw.circle(screen, (255, 0, 0), (100 + counter, 250), 50)
+                pygame.display.flip()
+                dirty = False
+
+            # Return control to the browser until the next animation frame.
+            # (asyncio.sleep is backed by setTimeout, which is clamped and not aligned to the display.)
+            await js.PysBridge.next_frame()
 
         pygame.quit()
 
@@ -22,12 +22,15 @@ class SimpleCounterComponent(pys.Bridge):
     # Hook relationships are defined by overriding the add_hooks method.
     def add_hooks(self) -> list[str | rx.Var]:
         return [
-            # UseState to record counter values.
-            self.use_state("counter", 0),
-            # UseRef to hold DOM elements.
-            self.use_ref("text_ref"),
-            # Call PyScript functions when the counter value changes with useEffect. wait for the promise to resolve before calling the function.
-            self.use_effect("change_title", [self.var("counter")]),
+            # Bundle the hooks into a single hook code.
+            self.bulk_hooks(
+                # UseState to record counter values.
+                states={"counter": 0},
+                # UseRef to hold DOM elements.
+                refs={"text_ref": None},
+                # Call PyScript functions when the counter value changes with useEffect. wait for the promise to resolve before calling the function.
+                effects={"change_title": [self.var("counter")]},
+            ),
         ]
 
     # Override the create method to define the component's structure.
@@ -39,6 +39,10 @@ class PysBridge {
         return typeof PysBridge.#pysBridge[pysid] !== "undefined";
     }
 
+    static next_frame() {
+        return new Promise((resolve) => requestAnimationFrame(resolve));
+    }
+
     constructor(pysid, privateConstructorKey) {
         if (privateConstructorKey !== PRIVATE_CONSTRUCTOR_KEY) {
             throw new Error("Cannot instantiate PysBridge directly.");
@@ -57,10 +61,11 @@ class PysBridge {
     }
 
     #resolve(funcname) {
-        if (typeof this.#promise[funcname] === "undefined") {
-            this.#promise[funcname] = this.#createPromise();
+        // Only wake up pending callers. Once a function is registered, call_func no longer waits.
+        if (typeof this.#promise[funcname] !== "undefined") {
+            this.#promise[funcname].resolve();
+            delete this.#promise[funcname];
         }
-        this.#promise[funcname].resolve();
     }
 
     async #wait(funcname) {
@@ -118,11 +123,16 @@ class PysBridge {
         this.#resolve(name);
     }
 
-    async call_func(name, ...args) {
-        await this.#wait(name);
+    call_func(name, ...args) {
+        // Call registered functions right away instead of awaiting the registration promise.
         if (typeof this.#funcs[name] === "function") {
-            await this.#funcs[name](...args);
+            try {
+                return Promise.resolve(this.#funcs[name](...args));
+            } catch (e) {
+                return Promise.reject(e);
+            }
         }
+        return this.#wait(name).then(() => this.#funcs[name](...args));
     }
 
     has_func(name) {
@@ -1,11 +1,290 @@
+import ast
+import functools
+import inspect
+import io
+import itertools
+import re
+import string
+import textwrap
+import tokenize
 import reflex as rx
 from reflex.utils import imports
 from typing import Any
 
 
-PYS_TYPES = ["py", "mpy", "py-game"]
+PYS_TYPES = ("py", "mpy", "py-game")
 PYS_DEF_VERSION = "2025.5.1"
 
+_PYS_TYPES_SET = frozenset(PYS_TYPES)
+_PYSID_COUNTER = itertools.count(1)
+_SCRIPT_CACHE: dict[tuple[type, int], str] = {}
+_PYSID_SANITIZE_RE = re.compile(r"[^a-zA-Z0-9_]")
+_PYSID_DELETE_TABLE = str.maketrans(
+    "",
+    "",
+    "".join(
+        c
+        for c in map(chr, range(128))
+        if c not in string.ascii_letters + string.digits + "_"
+    ),
+)
+# f-strings are split into several tokens on Python 3.12+
+_FSTRING_START = getattr(tokenize, "FSTRING_START", None)
+_FSTRING_END = getattr(tokenize, "FSTRING_END", None)
+_CPYTHON_IMPORT_RE = re.compile(
+    r"^\s*(?:import|from)\s+(?:numpy|scipy|pandas|sklearn)\b", re.MULTILINE
+)
+_PYS_ORIGIN = "https://pyscript.net"
+_ESCAPE_TABLE = str.maketrans(
+    {
+        "\\": "\\\\",
+        '"': '\\"',
+        "\n": "\\n",
+        "\r": "\\r",
+        "\t": "\\t",
+        "\u2028": "\\u2028",
+        "\u2029": "\\u2029",
+    }
+)
+_SET_PYSID_REF_TMPL = 'var %s=globalThis.PysBridge.create_pys_bridge("%s");'
+_USE_STATE_TMPL = 'var [%s,%s]=useState(%s);%s.add_state("%s",%s,%s);'
+_USE_REF_TMPL = 'var %s=useRef(%s);%s.add_ref("%s",%s);'
+_USE_EFFECT_TMPL = 'useEffect(()=>{%s.call_func("%s").catch(console.error);}%s);'
+_BRIDGE_SCRIPT_TMPL = (
+    "import js\n"
+    "from pyscript.ffi import create_proxy\n"
+    '%(var)s=js.PysBridge.get_pys_bridge("%(pysid)s")\n'
+    "async def %(func)s(pys,js,proxy):\n"
+    "%(code)s\n"
+    "await %(func)s(%(var)s,js,create_proxy)\n"
+    "%(var)s=None\n"
+    "%(func)s=None\n"
+)
+_CALL_FUNC_TMPL = (
+    'globalThis.PysBridge.get_pys_bridge("%s").call_func("%s"%s).catch(console.error);'
+)
+
+
+def _dedent_code(code: str) -> str:
+    """
+    Remove the common leading whitespace from a code string.
+
+    :param code: Source code
+    """
+    return textwrap.dedent(code).strip() + "\n"
+
+
+def _sanitize_str(data: str) -> str:
+    """
+    Escape a string and wrap it in double quotes.
+
+    :param data: String value
+    """
+    return '"' + data.translate(_ESCAPE_TABLE) + '"'
+
+
+def _sanitize_other(data: Any) -> str:
+    """
+    Convert a value whose exact type is not in _SANITIZE_DISPATCH (e.g. a str subclass) to JavaScript.
+
+    :param data: Value
+    """
+    if isinstance(data, str):
+        return _sanitize_str(data)
+    return str(data)
+
+
+_SANITIZE_DISPATCH = {
+    type(None): lambda data: "null",
+    bool: lambda data: "true" if data else "false",
+    int: str,
+    float: str,
+    str: _sanitize_str,
+}
+
+
+def _has_multiline_string(code: str) -> bool:
+    """
+    Check whether the code contains a string literal that spans several lines (triple-quoted or continued with a backslash).
+
+    :param code: Source code
+    """
+    fstring_rows = []
+    for token in tokenize.generate_tokens(io.StringIO(code).readline):
+        if token.type == _FSTRING_START:
+            fstring_rows.append(token.start[0])
+        elif token.type == _FSTRING_END:
+            if fstring_rows.pop() != token.end[0]:
+                return True
+        elif token.start[0] != token.end[0]:
+            return True
+    return False
+
+
+@functools.lru_cache(maxsize=1024)
+def _sanitize_pysid(pysid: str) -> str:
+    """
+    Remove characters that cannot be used in a JavaScript variable name from a pysid (cached).
+
+    :param pysid: PyScriptBridge ID
+    """
+    if pysid.isascii():
+        if pysid.isidentifier():
+            # Already made of [a-zA-Z0-9_] only (e.g. generated pysids)
+            return pysid
+        return pysid.translate(_PYSID_DELETE_TABLE)
+    return _PYSID_SANITIZE_RE.sub("", pysid)
+
+
+@functools.lru_cache(maxsize=1024)
+def _var_name(name: str, pysid: str | None) -> str:
+    """
+    Create a variable name for PyScriptBridge (cached).
+
+    :param name: Variable name
+    :param pysid: PyScriptBridge ID
+    """
+    return name + _sanitize_pysid(pysid) if pysid else name
+
+
+def _default_script_type(code: str | None) -> str:
+    """
+    Choose the PyScript type for a script: "py" (Pyodide) only when the code imports packages that need CPython, "mpy" otherwise.
+
+    :param code: Source code, or None for external scripts
+    """
+    if code is not None and _CPYTHON_IMPORT_RE.search(code) is not None:
+        return "py"
+    return "mpy"
+
+
+@functools.lru_cache(maxsize=1024)
+def _call_func_script(pysid: str, func_name: str, args: str) -> str:
+    """
+    Build the JavaScript code that calls a PyScript function (cached per call site).
+
+    :param pysid: PyScriptBridge ID
+    :param func_name: PyScript function name
+    :param args: Sanitized arguments, each preceded by a comma
+    """
+    return _CALL_FUNC_TMPL % (pysid, func_name, args)
+
+
+def _bridge_var(suffix: str) -> str:
+    """
+    Get the JavaScript variable name that holds the PysBridge of a pysid in the component body.
+
+    :param suffix: PyScriptBridge ID already sanitized with _sanitize_pysid
+    """
+    return "__pys_bridge" + suffix
+
+
+@functools.lru_cache(maxsize=1024)
+def _pysid_ref_hook(pysid: str) -> str:
+    """
+    Build the hook code that creates the PysBridge for a pysid (cached).
+
+    :param pysid: PyScriptBridge ID
+    """
+    return _SET_PYSID_REF_TMPL % (_bridge_var(_sanitize_pysid(pysid)), pysid)
+
+
+@functools.lru_cache(maxsize=1024)
+def _setter_name(var_name: str) -> str:
+    """
+    Get the useState setter name for a variable name ("textRef" -> "setTextRef").
+    Unlike str.capitalize, the rest of the name keeps its case.
+
+    :param var_name: Variable name of useState
+    """
+    return "set" + var_name[:1].upper() + var_name[1:]
+
+
+@functools.lru_cache(maxsize=1024)
+def _use_state_hook(pysid: str, var_name: str, initial_value: str) -> str:
+    """
+    Build the useState hook code (cached).
+
+    :param pysid: PyScriptBridge ID
+    :param var_name: Variable name of useState
+    :param initial_value: Sanitized initial value of useState
+    """
+    suffix = _sanitize_pysid(pysid)
+    state = var_name + suffix
+    setter = _setter_name(var_name) + suffix
+    return _USE_STATE_TMPL % (
+        state,
+        setter,
+        initial_value,
+        _bridge_var(suffix),
+        var_name,
+        state,
+        setter,
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _use_ref_hook(pysid: str, ref_name: str, ref_value: str) -> str:
+    """
+    Build the useRef hook code (cached).
+
+    :param pysid: PyScriptBridge ID
+    :param ref_name: Variable name of useRef
+    :param ref_value: Sanitized initial value of useRef
+    """
+    suffix = _sanitize_pysid(pysid)
+    ref = ref_name + suffix
+    return _USE_REF_TMPL % (ref, ref_value, _bridge_var(suffix), ref_name, ref)
+
+
+@functools.lru_cache(maxsize=1024)
+def _use_effect_hook(
+    pysid: str, effect_func: str, effect_vars: tuple[str, ...] | None
+) -> str:
+    """
+    Build the useEffect hook code (cached).
+
+    :param pysid: PyScriptBridge ID
+    :param effect_func: Function name to call from useEffect
+    :param effect_vars: Dependencies of useEffect
+    """
+    deps = "" if effect_vars is None else f",[{','.join(effect_vars)}]"
+    return _USE_EFFECT_TMPL % (_bridge_var(_sanitize_pysid(pysid)), effect_func, deps)
+
+
+@functools.lru_cache(maxsize=1024)
+def _bridge_script(script_class: type, pysid: str) -> str:
+    """
+    Build the PyScript code of a Bridge component (cached).
+    The script body is wrapped in a function that receives the PysBridge of the pysid.
+
+    :param script_class: Bridge class that defines the 'script' method
+    :param pysid: PyScriptBridge ID
+    """
+    suffix = _sanitize_pysid(pysid)
+    return _BRIDGE_SCRIPT_TMPL % {
+        "pysid": pysid,
+        "func": f"__pys_func{suffix}",
+        "var": f"__pys_var{suffix}",
+        "code": Script.generate_script(script_class, 4),
+    }
+
+
+def _prepare_script(script_class: type, indent: int = 0) -> None:
+    """
+    Generate and cache the script of a class when the class is defined, so that create() only assembles strings.
+    If the source is not available (e.g. classes defined in an interactive session), it is generated on create() instead.
+
+    :param script_class: Class that defines the 'script' method
+    :param indent: Number of spaces to indent the code
+    """
+    if not hasattr(script_class, "script"):
+        return
+    try:
+        Script.generate_script(script_class, indent)
+    except (OSError, TypeError):
+        pass
+
 
 class Init(rx.Script):
     """
@@ -13,16 +292,22 @@ class Init(rx.Script):
     """
 
     @classmethod
-    def create(cls, version: str = PYS_DEF_VERSION) -> rx.Script:
+    def create(cls, version: str = PYS_DEF_VERSION) -> rx.Fragment:
         """
         Add a component to the page that initializes PyScript.
+        core.js is preloaded and executed after the page becomes interactive, so it does not block the first render.
 
         :param version: PyScript version
         """
-        return super().create(
-            src=f"https://pyscript.net/releases/{version}/core.js",
-            custom_attrs={"type": "module"},
-            strategy="beforeInteractive",
+        core_js_url = f"{_PYS_ORIGIN}/releases/{version}/core.js"
+        return rx.fragment(
+            rx.el.link(rel="preconnect", href=_PYS_ORIGIN, cross_origin="anonymous"),
+            rx.el.link(rel="modulepreload", href=core_js_url),
+            super().create(
+                src=core_js_url,
+                custom_attrs={"type": "module"},
+                strategy="afterInteractive",
+            ),
         )
 
     def add_imports(self) -> imports.ImportDict:
@@ -37,33 +322,56 @@ class Script(rx.Script):
     Component that loads external PyScript files.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        """
+        Generate the script of the subclass once, when it is defined.
+        """
+        super().__init_subclass__(**kwargs)
+        _prepare_script(cls)
+
     @classmethod
     def create(
-        cls, src: str | None = None, script_type: str = "mpy", script_config: str = "{}"
+        cls,
+        src: str | None = None,
+        script_type: str | None = None,
+        script_config: str = "{}",
+        worker: bool = False,
     ) -> rx.Script:
         """
         Add a component to the page that loads external PyScript files.
 
         :param src: PyScript file path
-        :param script_type: PyScript type ("py", "mpy", "py-game")
+        :param script_type: PyScript type ("py", "mpy", "py-game"). Defaults to "mpy", or "py" if the script imports numpy, scipy, pandas or sklearn.
         :param script_config: PyScript config
+        :param worker: Whether to run the script in a Web Worker (not supported for "py-game")
         """
 
-        if script_type not in PYS_TYPES:
+        code = Script.generate_script(cls) if src is None else None
+        if script_type is None:
+            script_type = _default_script_type(code)
+
+        if script_type not in _PYS_TYPES_SET:
             raise ValueError(
                 f"Invalid type '{script_type}'. Valid types are: {', '.join(PYS_TYPES)}"
             )
 
+        custom_attrs = {"type": script_type, "config": script_config}
+        if worker:
+            if script_type == "py-game":
+                raise ValueError(
+                    "PyScript does not support running 'py-game' in a worker."
+                )
+            custom_attrs["worker"] = ""
+
         if src is None:
-            code = Script.generate_script(cls)
             return super().create(
                 code,
-                custom_attrs={"type": script_type, "config": script_config},
+                custom_attrs=custom_attrs,
             )
         else:
             return super().create(
                 src=src,
-                custom_attrs={"type": script_type, "config": script_config},
+                custom_attrs=custom_attrs,
             )
 
     @classmethod
@@ -73,27 +381,43 @@ class Script(rx.Script):
                 "Script not found. Please define the 'script' method to generate the script."
             )
 
-        import inspect
-        import ast
-        import textwrap
+        # The source of a class doesn't change at runtime, so parse it only once
+        key = (script_class, indent)
+        if key in _SCRIPT_CACHE:
+            return _SCRIPT_CACHE[key]
+
+        body_code = _SCRIPT_CACHE.get((script_class, 0))
+        if body_code is None:
+            # Get the source code of the script
+            source = inspect.getsource(script_class.script)
+            source = _dedent_code(source)  # delete leading whitespace
 
-        # Get the source code of the script
-        source = inspect.getsource(script_class.script)
-        source = textwrap.dedent(source)  # delete leading whitespace
+            # Parse the source code into an AST
+            parsed = ast.parse(source)
+            func_node = parsed.body[0]  # get the first node (function definition)
 
-        # Parse the source code into an AST
-        parsed = ast.parse(source)
-        func_node = parsed.body[0]  # get the first node (function definition)
+            # Get the function body
+            body_nodes = func_node.body  # type: ignore
 
-        # Get the function body
-        body_nodes = func_node.body  # type: ignore
+            # Slice the body out of the source to keep its original text.
+            # Strings spanning several lines are left to ast.unparse, since re-indenting would change their value.
+            first_line = body_nodes[0].lineno
+            if first_line > func_node.lineno and not _has_multiline_string(source):
+                body_lines = source.splitlines()[first_line - 1 :]
+                body_code = textwrap.dedent("\n".join(body_lines)).rstrip()
+                if body_code[:1] in ("", " ", "\t"):
+                    body_code = None
 
-        # Convert the AST back to source code
-        body_code = "\n".join([ast.unparse(stmt) for stmt in body_nodes])
+            if body_code is None:
+                # Convert the AST back to source code
+                body_code = "\n".join([ast.unparse(stmt) for stmt in body_nodes])
+
+            _SCRIPT_CACHE[(script_class, 0)] = body_code
 
         # indent the code
         if indent > 0:
             body_code = textwrap.indent(body_code, " " * indent)
+            _SCRIPT_CACHE[key] = body_code
 
         return body_code
 
@@ -103,6 +427,13 @@ class PyGame:
     Component that execute PyGame script.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        """
+        Generate the script of the subclass once, when it is defined.
+        """
+        super().__init_subclass__(**kwargs)
+        _prepare_script(cls)
+
     def __init__(self):
         """
         Initialize a PyGame object.
@@ -153,6 +484,8 @@ class Var(rx.Var):
     Alias for rx.Var to be used in PyScriptBridge.
     """
 
+    __slots__ = ()
+
     def __init__(self, name: str, pysid: str = ""):
         """
         Initialize a Var object.
@@ -169,9 +502,7 @@ class Var(rx.Var):
 
         :param pysid: PyScriptBridge ID
         """
-        import re
-
-        return re.sub(r"[^a-zA-Z0-9_]", "", pysid)
+        return _sanitize_pysid(pysid)
 
     @classmethod
     def name(cls, name: str, pysid: str | None = None) -> str:
@@ -181,7 +512,7 @@ class Var(rx.Var):
         :param name: Variable name
         :param pysid: PyScriptBridge ID
         """
-        return f"{name}{cls.sanitize_pysid(pysid)}" if pysid else name
+        return _var_name(name, pysid)
 
 
 class Bridge(rx.Fragment):
@@ -189,6 +520,13 @@ class Bridge(rx.Fragment):
     Base class for components that use Hooks.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        """
+        Generate the script of the subclass once, when it is defined.
+        """
+        super().__init_subclass__(**kwargs)
+        _prepare_script(cls, 4)
+
     def __init__(self):
         """
         Initialize a Bridge object.
@@ -205,28 +543,26 @@ class Bridge(rx.Fragment):
         :param args: Positional arguments
         :param kwargs: Keyword arguments
         """
-        pysid = kwargs.get("data_pysid", "")
-        if not isinstance(pysid, str):
+        pysid = kwargs.pop("data_pysid", "")
+        if pysid is None:
+            pysid = ""
+        if __debug__ and not isinstance(pysid, str):
             raise TypeError(f"Invalid type '{type(pysid)}'. pysid must be a string.")
-        kwargs.pop("data_pysid", None)
+        pys_type = kwargs.pop("pys_type", None)
+        pys_config = kwargs.pop("pys_config", "{}")
         new_kwargs = {
             **kwargs,
             "key": pysid,
         }
 
-        pys_type = kwargs.get("pys_type", "mpy")
-        if pys_type not in PYS_TYPES:
+        if pys_type is None:
+            pys_type = _default_script_type(Script.generate_script(cls))
+        if pys_type not in _PYS_TYPES_SET:
             raise ValueError(
                 f"Invalid type '{pys_type}'. Valid types are: {', '.join(PYS_TYPES)}"
             )
-        pys_config = kwargs.get("pys_config", "{}")
-        pys_func = Var.name("__pys_func", pysid)
-        pys_var = Var.name("__pys_var", pysid)
-        pre_code = f'import js\nfrom pyscript.ffi import create_proxy\n{pys_var} = js.PysBridge.get_pys_bridge("{pysid}")\n\nasync def {pys_func}(pys, js, proxy):\n'
-        aft_code = f"\n\nawait {pys_func}({pys_var}, js, create_proxy)\n{pys_var} = None\n{pys_func} = None\n"
-        pys_code = Script.generate_script(cls, 4)
         pys_element = rx.script(
-            f"{pre_code}{pys_code}{aft_code}",
+            _bridge_script(cls, pysid),
             custom_attrs={"type": pys_type, "config": pys_config},
         )
         new_args = args + (pys_element,)
@@ -241,25 +577,16 @@ class Bridge(rx.Fragment):
     def generate_pysid(cls) -> str:
         """
         Generate a unique pysid for the component.
+        The pysid is the class name plus a process-wide counter: unique within a process and stable across restarts.
         """
-        import uuid
-
-        return str(uuid.uuid4())
+        return f"{cls.__name__}_{next(_PYSID_COUNTER)}"
 
     @classmethod
     def sanitize_value(cls, data: Any) -> str:
         """
-        Returns "null" if the value is None. If the value is a string, it escapes the string and wraps it in double quotes.
+        Returns "null" if the value is None and "true"/"false" if it is a bool. If the value is a string, it escapes the string and wraps it in double quotes.
         """
-        return (
-            "null"
-            if data is None
-            else (
-                f'"{data.replace("\\", "\\\\").replace('"', '\\"')}"'
-                if isinstance(data, str)
-                else str(data)
-            )
-        )
+        return _SANITIZE_DISPATCH.get(type(data), _sanitize_other)(data)
 
     @classmethod
     def call_func(cls, func_name: str, pysid: str = "", *args) -> rx.event.EventSpec:
@@ -272,11 +599,41 @@ class Bridge(rx.Fragment):
         :param args: Arguments to be passed to the PyScript function.
         """
         return rx.call_script(
-            f"""
-                (async () => {{
-                    await globalThis.PysBridge.get_pys_bridge("{pysid}").call_func("{func_name}", {', '.join([cls.sanitize_value(arg) for arg in args])});
-                }})();
-            """
+            _call_func_script(
+                pysid,
+                func_name,
+                "," + ",".join(map(cls.sanitize_value, args)) if args else "",
+            )
+        )
+
+    @classmethod
+    def bundle_hooks(cls, *hooks: str) -> str:
+        """
+        Join multiple hook codes into a single hook code.
+        Each hook is placed on its own line, so hooks without a trailing ";" or ending in a "//" comment stay separate.
+
+        :param hooks: Hook codes returned by use_state, use_ref, use_effect, etc.
+        """
+        return "\n".join(hook.strip() for hook in hooks)
+
+    def bulk_hooks(
+        self,
+        states: dict[str, Any] | None = None,
+        refs: dict[str, Any] | None = None,
+        effects: dict[str, list[str] | None] | None = None,
+    ) -> str:
+        """
+        Define multiple useState, useRef and useEffect hooks as a single hook code with bundle_hooks.
+        All of them share the PysBridge reference created by set_pysid_ref.
+
+        :param states: useState variable names and their initial values
+        :param refs: useRef variable names and their initial values
+        :param effects: Function names to call from useEffect and their dependencies
+        """
+        return self.bundle_hooks(
+            *(self.use_state(name, value) for name, value in (states or {}).items()),
+            *(self.use_ref(name, value) for name, value in (refs or {}).items()),
+            *(self.use_effect(func, deps) for func, deps in (effects or {}).items()),
         )
 
     def add_imports(self) -> imports.ImportDict:
@@ -299,11 +656,11 @@ class Bridge(rx.Fragment):
 
     def set_pysid_ref(self) -> str:
         """
-        Create a UUID reference for the component.
-        """
-        return f"""
-            globalThis.PysBridge.create_pys_bridge("{self.key}");
+        Create the component's PysBridge and bind it to the __pys_bridge<pysid> alias in the component body.
+        use_state, use_ref and use_effect reference the alias, so it must be declared first.
+        Bridge.add_hooks returns it, and Reflex emits the hooks of parent classes before those of subclasses.
         """
+        return _pysid_ref_hook(self.key)
 
     def use_state(self, var_name: str, initial_value: Any = None) -> str:
         """
@@ -312,11 +669,7 @@ class Bridge(rx.Fragment):
         :param var_name: Variable name of useState
         :param initial_value: Initial value of useState, or null if none is specified.
         """
-        initial_value = self.sanitize_value(initial_value)
-        return f"""
-            var [{Var.name(var_name, self.key)}, set{Var.name(var_name.capitalize(), self.key)}] = useState({initial_value});
-            globalThis.PysBridge.get_pys_bridge("{self.key}").add_state("{var_name}", {Var.name(var_name, self.key)}, set{Var.name(var_name.capitalize(), self.key)});
-        """
+        return _use_state_hook(self.key, var_name, self.sanitize_value(initial_value))
 
     def use_ref(self, ref_name: str, ref_value: Any = None) -> str:
         """
@@ -325,11 +678,7 @@ class Bridge(rx.Fragment):
         :param ref_name: Variable name of useRef
         :param ref_value: Initial value of useRef, or null if none is specified.
         """
-        ref_value = self.sanitize_value(ref_value)
-        return f"""
-            var {Var.name(ref_name, self.key)} = useRef({ref_value});
-            globalThis.PysBridge.get_pys_bridge("{self.key}").add_ref("{ref_name}", {Var.name(ref_name, self.key)});
-        """
+        return _use_ref_hook(self.key, ref_name, self.sanitize_value(ref_value))
 
     def use_effect(self, effect_func: str, effect_vars: list[str] | None = None) -> str:
         """
@@ -338,13 +687,9 @@ class Bridge(rx.Fragment):
         :param effect_func: Function name to call from useEffect
         :param effect_vars: Dependencies of useEffect
         """
-        return f"""
-            useEffect(() => {{
-                (async () => {{
-                    await globalThis.PysBridge.get_pys_bridge("{self.key}").call_func("{effect_func}");
-                }})();
-            }}{', [' + ', '.join(effect_vars) + ']' if effect_vars is not None else ''});
-        """
+        return _use_effect_hook(
+            self.key, effect_func, None if effect_vars is None else tuple(effect_vars)
+        )
 
     def var(self, var_name: str) -> str:
         """